@@ -0,0 +1,71 @@
+"""Accuracy-versus-latency benchmark for approximate analysis.
+
+Usage: python benchmarks/bench_approximate.py [rows]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from insight_agent.engine import InsightAgentEngine
+from insight_agent.schemas import InsightAgentRequest
+
+
+def build_records(rows: int, seed: int = 0) -> list[dict[str, object]]:
+    rng = np.random.default_rng(seed)
+    spend = rng.lognormal(mean=3.0, sigma=1.4, size=rows)
+    impressions = spend * rng.uniform(60, 140, size=rows)
+    frame = pd.DataFrame(
+        {
+            "Campaign name": rng.integers(0, 200, size=rows).astype(str),
+            "Ad set name": rng.integers(0, 2000, size=rows).astype(str),
+            "Ad name": np.arange(rows).astype(str),
+            "Spend": spend.round(2),
+            "Impressions": impressions.round(),
+            "Clicks": (impressions * rng.uniform(0.004, 0.03, size=rows)).round(),
+            "Purchases": rng.poisson(spend / 40),
+            "Purchase value": (spend * rng.gamma(2.0, 1.0, size=rows)).round(2),
+            "Adds to cart": rng.poisson(spend / 10),
+        }
+    )
+    return frame.to_dict(orient="records")
+
+
+def main(rows: int) -> None:
+    request = InsightAgentRequest(dataset_name="bench", records=build_records(rows))
+    engine = InsightAgentEngine()
+
+    started = time.perf_counter()
+    exact = engine.analyze(request)
+    exact_ms = (time.perf_counter() - started) * 1000
+    print(f"rows={rows} exact: {exact_ms:,.0f} ms")
+    print(f"{'sample':>8} {'ms':>8} {'roas err':>9} {'roas ci':>9} {'ctr err':>9} {'ctr ci':>9}")
+
+    for sample_size in (1_000, 5_000, 20_000, 50_000):
+        if sample_size >= rows:
+            break
+        started = time.perf_counter()
+        # Only the first pass is timed; the refinement pass is never requested.
+        response = next(
+            engine.analyze_progressive(
+                request,
+                runtime_overrides={"approximate": True, "sample_size": sample_size},
+            )
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        intervals = response.approximation.confidence_intervals
+        cells = []
+        for metric in ("roas", "ctr"):
+            truth = float(exact.metrics_snapshot[metric])
+            error = abs(float(response.metrics_snapshot[metric]) - truth) / truth
+            low, high = intervals[metric]
+            cells.append(f"{error:>8.2%} {(high - low) / 2 / truth:>8.2%}")
+        print(f"{sample_size:>8} {elapsed_ms:>8,.0f} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
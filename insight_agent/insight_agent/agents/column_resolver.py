@@ -15,6 +15,8 @@ CANONICAL_FIELDS: Dict[str, Tuple[str, ...]] = {
     "clicks": ("clicks", "link_clicks", "click_count"),
     "ctr": ("ctr", "click_through_rate"),
     "frequency": ("frequency",),
+    "frequency_growth": ("frequency_growth", "freq_growth"),
+    "spend_pacing": ("spend_pacing",),
     "roas": ("roas", "return_on_ad_spend"),
     "purchases": ("purchases", "purchase", "conversions", "results"),
     "purchase_value": ("purchase_value", "purchasevalue", "value", "revenue"),
@@ -27,6 +29,7 @@ CANONICAL_FIELDS: Dict[str, Tuple[str, ...]] = {
         "ctr_prev_week",
     ),
     "status": ("status", "delivery", "state"),
+    "date": ("date", "day", "report_date", "reporting_starts", "date_start"),
     "ad_name": ("ad", "ad_name", "creative_name"),
     "ad_id": ("ad_id", "adid", "adset_ad_id"),
     "campaign_name": ("campaign_name", "campaign"),
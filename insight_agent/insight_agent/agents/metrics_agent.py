@@ -1,27 +1,59 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
-from ..schemas import ColumnMapping
+from ..schemas import ColumnMapping, RollupNode
+
+
+ROLLUP_FIELDS = (
+    "spend",
+    "impressions",
+    "clicks",
+    "purchases",
+    "purchase_value",
+    "adds_to_cart",
+)
 
 
 @dataclass
 class MetricsResult:
     summary: Dict[str, float]
     entity_metrics: pd.DataFrame
+    rollups: List[RollupNode] = field(default_factory=list)
+
+
+ROLLUP_LEVELS = ("campaign", "adset", "ad")
+
+
+def _rollup_records(sums: Dict[str, np.ndarray]) -> List[Dict[str, float]]:
+    metrics = pd.DataFrame(sums)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics["ctr"] = np.where(
+            sums["impressions"] > 0, sums["clicks"] / sums["impressions"], 0.0
+        )
+        metrics["roas"] = np.where(
+            sums["spend"] > 0, sums["purchase_value"] / sums["spend"], 0.0
+        )
+        metrics["cpa"] = np.where(sums["purchases"] > 0, sums["spend"] / sums["purchases"], 0.0)
+    return metrics.to_dict(orient="records")
 
 
 class MetricsAgent:
     """Derive key marketing metrics ready for downstream insight agents."""
 
-    def __init__(self, mapping: ColumnMapping) -> None:
+    def __init__(self, mapping: ColumnMapping, rollup_depth: str = "adset") -> None:
         self.mapping = mapping
+        self.rollup_depth = rollup_depth
 
-    def run(self, frame: pd.DataFrame) -> MetricsResult:
+    def run(
+        self, frame: pd.DataFrame, weights: Optional[np.ndarray] = None
+    ) -> MetricsResult:
         df = frame.copy()
+        weight = np.ones(len(df)) if weights is None else np.asarray(weights, dtype=float)
 
         def safe_cast(column: Optional[str]) -> Optional[pd.Series]:
             if column is None:
@@ -59,6 +91,16 @@ class MetricsAgent:
             if self.mapping.ctr_prev_7d
             else pd.NA
         )
+        df["__frequency_growth"] = (
+            pd.to_numeric(df[self.mapping.frequency_growth], errors="coerce")
+            if self.mapping.frequency_growth
+            else pd.NA
+        )
+        df["__spend_pacing"] = (
+            pd.to_numeric(df[self.mapping.spend_pacing], errors="coerce")
+            if self.mapping.spend_pacing
+            else pd.NA
+        )
 
         agg = df[
             [
@@ -69,7 +111,7 @@ class MetricsAgent:
                 "__purchase_value",
                 "__adds_to_cart",
             ]
-        ].sum(numeric_only=True)
+        ].mul(weight, axis=0).sum(numeric_only=True)
 
         summary: Dict[str, float] = {
             "spend": float(agg["__spend"]),
@@ -119,8 +161,73 @@ class MetricsAgent:
                 "__ctr",
                 "__ctr_7d",
                 "__ctr_prev_7d",
+                "__frequency_growth",
+                "__spend_pacing",
             ]
         ].copy()
 
-        return MetricsResult(summary=summary, entity_metrics=entity_frame)
+        return MetricsResult(
+            summary=summary,
+            entity_metrics=entity_frame,
+            rollups=self._build_rollups(df, weight),
+        )
+
+    def _build_rollups(self, df: pd.DataFrame, weight: np.ndarray) -> List[RollupNode]:
+        levels: List[Tuple[str, str]] = [
+            (level, column)
+            for level, column in [
+                ("campaign", self.mapping.campaign_name),
+                ("adset", self.mapping.adset_name),
+                ("ad", self.mapping.ad_name or self.mapping.ad_id),
+            ]
+            if column and ROLLUP_LEVELS.index(level) <= ROLLUP_LEVELS.index(self.rollup_depth)
+        ]
+        if not levels or df.empty:
+            return []
+
+        # Sort once by the full hierarchy; every level's groups are then
+        # contiguous runs that can be reduced with a single reduceat each.
+        labels = [
+            df[column].fillna("").astype(str).to_numpy() for _, column in levels
+        ]
+        codes = [pd.factorize(values, sort=True)[0] for values in labels]
+        order = np.lexsort(codes[::-1])
+        sorted_codes = [level_codes[order] for level_codes in codes]
+        values = {
+            name: np.nan_to_num(df[f"__{name}"].to_numpy(dtype=float) * weight)[order]
+            for name in ROLLUP_FIELDS
+        }
+
+        changed = np.zeros(len(order) - 1, dtype=bool)
+        nodes_by_level: List[List[RollupNode]] = []
+        starts_by_level: List[np.ndarray] = []
+        for (level, _), level_codes, level_labels in zip(levels, sorted_codes, labels):
+            changed |= level_codes[1:] != level_codes[:-1]
+            starts = np.concatenate(([0], np.flatnonzero(changed) + 1))
+            sums = {
+                name: np.add.reduceat(column_values, starts)
+                for name, column_values in values.items()
+            }
+            names = level_labels[order[starts]].tolist()
+            nodes_by_level.append(
+                [
+                    RollupNode.model_construct(
+                        level=level, name=name, metrics=metrics, children=[]
+                    )
+                    for name, metrics in zip(names, _rollup_records(sums))
+                ]
+            )
+            starts_by_level.append(starts)
+
+        for depth in range(len(levels) - 1, 0, -1):
+            parents = (
+                np.searchsorted(
+                    starts_by_level[depth - 1], starts_by_level[depth], side="right"
+                )
+                - 1
+            )
+            for child, parent in zip(nodes_by_level[depth], parents):
+                nodes_by_level[depth - 1][int(parent)].children.append(child)
+
+        return nodes_by_level[0]
 
@@ -1,21 +1,32 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence
 
 import pandas as pd
 
-from ..schemas import InsightAgentInsight
+from ..schemas import InsightAgentInsight, RollupNode
 from ..utils.text import human_join
 
 
 class RecommendationAgent:
     """Generate actionable optimization guidance from metrics."""
 
-    def __init__(self, minimum_spend: float = 50.0) -> None:
+    LEVEL_LABELS = {"campaign": "Campaign", "adset": "Ad set", "ad": "Ad"}
+
+    def __init__(
+        self,
+        minimum_spend: float = 50.0,
+        roas_guardrail: float = 1.5,
+        rollup_levels: Sequence[str] = ("campaign", "adset"),
+    ) -> None:
         self.minimum_spend = minimum_spend
+        self.roas_guardrail = roas_guardrail
+        self.rollup_levels = tuple(rollup_levels)
 
-    def run(self, frame: pd.DataFrame) -> List[InsightAgentInsight]:
-        insights: List[InsightAgentInsight] = []
+    def run(
+        self, frame: pd.DataFrame, rollups: Optional[Sequence[RollupNode]] = None
+    ) -> List[InsightAgentInsight]:
+        insights: List[InsightAgentInsight] = self._rollup_insights(rollups or [], [])
         working = frame.copy()
         for column in working.columns:
             if column.startswith("__"):
@@ -43,6 +54,16 @@ class RecommendationAgent:
                 if row["__ctr_prev_7d"] == row["__ctr_prev_7d"]
                 else None
             )
+            frequency_growth = (
+                float(row["__frequency_growth"])
+                if row["__frequency_growth"] == row["__frequency_growth"]
+                else None
+            )
+            spend_pacing = (
+                float(row["__spend_pacing"])
+                if row["__spend_pacing"] == row["__spend_pacing"]
+                else None
+            )
 
             entity_parts = [
                 str(value)
@@ -61,7 +82,7 @@ class RecommendationAgent:
             ]
             impacted_entities = [human_join(entity_parts)] if entity_parts else []
 
-            if roas and roas < 1.5:
+            if roas and roas < self.roas_guardrail:
                 recommendation = (
                     "Test 2–3 new hooks or thumbnails, rotate in fresh creative, and cap frequency if delivery is fatigued."
                 )
@@ -93,17 +114,26 @@ class RecommendationAgent:
 
             if ctr_7d is not None and ctr_prev_7d is not None:
                 if ctr_prev_7d and (ctr_prev_7d - ctr_7d) / ctr_prev_7d > 0.25:
+                    supporting_data: Dict[str, object] = {
+                        "ctr_7d": ctr_7d,
+                        "ctr_prev_7d": ctr_prev_7d,
+                    }
+                    if frequency_growth is not None:
+                        supporting_data["frequency_growth"] = frequency_growth
+                    if spend_pacing is not None:
+                        supporting_data["spend_pacing"] = spend_pacing
                     insights.append(
                         InsightAgentInsight(
                             topic="fatigue",
-                            severity="info",
+                            severity=(
+                                "warning"
+                                if frequency_growth is not None and frequency_growth > 0.2
+                                else "info"
+                            ),
                             summary="CTR dropped >25% vs previous 7 days.",
                             recommendation="Refresh creative variants or rotate in best performers to arrest fatigue.",
                             impacted_entities=impacted_entities,
-                            supporting_data={
-                                "ctr_7d": ctr_7d,
-                                "ctr_prev_7d": ctr_prev_7d,
-                            },
+                            supporting_data=supporting_data,
                         )
                     )
 
@@ -119,3 +149,39 @@ class RecommendationAgent:
             )
 
         return insights
+
+    def _rollup_insights(
+        self, nodes: Sequence[RollupNode], path: List[str]
+    ) -> List[InsightAgentInsight]:
+        insights: List[InsightAgentInsight] = []
+        for node in nodes:
+            node_path = path + [node.name]
+            spend = node.metrics.get("spend", 0.0)
+            roas = node.metrics.get("roas", 0.0)
+            if (
+                node.level in self.rollup_levels
+                and spend >= self.minimum_spend
+                and roas
+                and roas < self.roas_guardrail
+            ):
+                label = self.LEVEL_LABELS[node.level]
+                insights.append(
+                    InsightAgentInsight(
+                        topic="roas",
+                        severity="warning" if roas > 1.0 else "critical",
+                        summary=f"{label} ROAS below efficiency guardrail at {roas:.2f}.",
+                        recommendation=(
+                            f"Shift budget away from this {label.lower()} toward stronger performers "
+                            "and review targeting before scaling."
+                        ),
+                        impacted_entities=[human_join(node_path)],
+                        supporting_data={
+                            "level": node.level,
+                            "spend": spend,
+                            "roas": roas,
+                            "cpa": node.metrics.get("cpa", 0.0),
+                        },
+                    )
+                )
+            insights.extend(self._rollup_insights(node.children, node_path))
+        return insights
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..schemas import ColumnMapping
+
+
+TOTAL_FIELDS = ("spend", "impressions", "clicks", "purchases", "purchase_value")
+RATIO_FIELDS = {
+    "ctr": ("clicks", "impressions"),
+    "roas": ("purchase_value", "spend"),
+}
+MIN_STRATUM_DRAWS = 5
+
+
+@dataclass
+class SamplingResult:
+    frame: pd.DataFrame
+    weights: np.ndarray
+    strata: np.ndarray
+    stratum_sizes: np.ndarray
+    stratum_samples: np.ndarray
+    rows_total: int
+
+    @property
+    def rows_sampled(self) -> int:
+        return len(self.frame)
+
+
+class SamplingAgent:
+    """Draw a spend-weighted stratified sample for approximate analysis."""
+
+    def __init__(
+        self,
+        mapping: ColumnMapping,
+        sample_size: int,
+        strata: int = 10,
+        seed: int = 0,
+    ) -> None:
+        self.mapping = mapping
+        self.sample_size = sample_size
+        self.strata = strata
+        self.seed = seed
+
+    def run(self, frame: pd.DataFrame) -> SamplingResult:
+        total = len(frame)
+        spend = (
+            pd.to_numeric(frame[self.mapping.spend], errors="coerce")
+            .fillna(0.0)
+            .clip(lower=0.0)
+            .to_numpy(dtype=float)
+        )
+
+        # Rows large enough to be drawn with certainty under spend-proportional
+        # sampling form their own take-all stratum; the rest are split into
+        # equal-count strata on spend rank.
+        descending = np.argsort(-spend, kind="stable")
+        sorted_spend = spend[descending]
+        budget = min(self.sample_size, total)
+        remaining_spend = sorted_spend.sum() - np.concatenate(
+            ([0.0], np.cumsum(sorted_spend)[:-1])
+        )
+        is_certain = (sorted_spend * (budget - np.arange(total)) >= remaining_spend) & (
+            sorted_spend > 0
+        )
+        certain = int(np.argmin(is_certain)) if not is_certain.all() else total
+        certain = min(certain, budget)
+        if certain < total:
+            # Leave two draws for the sampled strata: one keeps their rows in
+            # the estimates, the second makes their variance estimable.
+            certain = max(min(certain, budget - 2), 0)
+
+        rest = total - certain
+        # Every sampled stratum gets at least two draws (see ``_allocate``), and
+        # small budgets use fewer, larger strata: a couple of draws from skewed
+        # spend usually underestimate the stratum variance.
+        strata_count = max(
+            1, min(self.strata, (budget - certain) // MIN_STRATUM_DRAWS, rest)
+        )
+        strata = np.empty(total, dtype=np.int64)
+        strata[descending[:certain]] = strata_count
+        strata[descending[certain:]] = (
+            strata_count - 1 - np.arange(rest) * strata_count // max(rest, 1)
+        )
+
+        sizes = np.bincount(strata, minlength=strata_count + 1)
+        samples = np.zeros_like(sizes)
+        samples[strata_count] = certain
+        spend_by_stratum = np.bincount(strata, weights=spend, minlength=strata_count + 1)
+        samples[:strata_count] = self._allocate(
+            sizes[:strata_count], spend_by_stratum[:strata_count], budget - certain
+        )
+
+        rng = np.random.default_rng(self.seed)
+        order = np.lexsort((rng.random(total), strata))
+        position = np.arange(total) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        keep = np.zeros(total, dtype=bool)
+        keep[order] = position < samples[strata[order]]
+
+        sampled_strata = strata[keep]
+        weights = sizes[sampled_strata] / samples[sampled_strata]
+        return SamplingResult(
+            frame=frame.loc[keep].reset_index(drop=True),
+            weights=weights.astype(float),
+            strata=sampled_strata,
+            stratum_sizes=sizes,
+            stratum_samples=samples,
+            rows_total=total,
+        )
+
+    @staticmethod
+    def _allocate(sizes: np.ndarray, spend: np.ndarray, budget: int) -> np.ndarray:
+        """Allocate two draws per non-empty stratum, the rest in proportion to spend."""
+
+        samples = np.minimum(sizes, 2 if 2 * len(sizes) <= budget else 1)
+        remaining = min(budget, int(sizes.sum())) - int(samples.sum())
+        while remaining > 0:
+            capacity = sizes - samples
+            measure = np.where(capacity > 0, spend, 0.0)
+            if measure.sum() <= 0:
+                measure = capacity.astype(float)
+            quota = remaining * measure / measure.sum()
+            share = np.minimum(np.floor(quota).astype(np.int64), capacity)
+            if share.sum() == 0:
+                # Hand out the last few draws by largest quota.
+                share[np.argsort(-quota, kind="stable")[:remaining]] = 1
+                share = np.minimum(share, capacity)
+            samples += share
+            remaining -= int(share.sum())
+        return samples
+
+
+def _t_quantile(probability: float, degrees_of_freedom: float) -> float:
+    """Student-t quantile via the Cornish-Fisher expansion of the normal one."""
+
+    z = NormalDist().inv_cdf(probability)
+    if degrees_of_freedom <= 0:
+        return z
+    terms = (
+        (z**3 + z) / 4,
+        (5 * z**5 + 16 * z**3 + 3 * z) / 96,
+        (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / 384,
+        (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z) / 92160,
+    )
+    return z + sum(
+        term / degrees_of_freedom ** (power + 1) for power, term in enumerate(terms)
+    )
+
+
+def estimate_intervals(
+    sampling: SamplingResult,
+    entity_metrics: pd.DataFrame,
+    confidence_level: float,
+) -> Dict[str, Tuple[float, float]]:
+    """Stratified confidence intervals for totals and ratio metrics."""
+
+    strata = sampling.strata
+    count = len(sampling.stratum_sizes)
+    sizes = sampling.stratum_sizes.astype(float)
+    samples = sampling.stratum_samples.astype(float)
+    weights = sampling.weights
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = np.where(
+            samples > 1, sizes**2 * (1 - samples / sizes) / samples, 0.0
+        )
+
+    # A stratum with a single draw out of several rows has no variance
+    # estimate; the sampler only produces one when the whole budget is a
+    # single row, and the interval is then unbounded rather than zero-width.
+    unestimable = bool(np.any((samples == 1) & (sizes > 1)))
+    # Student-t critical value: small samples leave few degrees of freedom
+    # for the variance estimate, and a normal quantile would undercover.
+    sampled = (samples > 1) & (samples < sizes)
+    critical = _t_quantile(
+        0.5 + confidence_level / 2, float(np.sum(samples[sampled] - 1))
+    )
+
+    def total_variance(values: np.ndarray) -> float:
+        if unestimable:
+            return float("inf")
+        sums = np.bincount(strata, weights=values, minlength=count)
+        squares = np.bincount(strata, weights=values**2, minlength=count)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variance = np.where(
+                samples > 1, (squares - sums**2 / samples) / (samples - 1), 0.0
+            )
+        return float(np.sum(factor * np.clip(variance, 0.0, None)))
+
+    values = {
+        name: np.nan_to_num(entity_metrics[f"__{name}"].to_numpy(dtype=float))
+        for name in TOTAL_FIELDS
+    }
+    estimates = {name: float(np.sum(weights * column)) for name, column in values.items()}
+
+    intervals: Dict[str, Tuple[float, float]] = {}
+    for name, column in values.items():
+        margin = critical * total_variance(column) ** 0.5
+        intervals[name] = (estimates[name] - margin, estimates[name] + margin)
+
+    for name, (numerator, denominator) in RATIO_FIELDS.items():
+        if not estimates[denominator]:
+            intervals[name] = (0.0, 0.0)
+            continue
+        ratio = estimates[numerator] / estimates[denominator]
+        residual = values[numerator] - ratio * values[denominator]
+        margin = critical * total_variance(residual) ** 0.5 / estimates[denominator]
+        intervals[name] = (ratio - margin, ratio + margin)
+
+    return intervals
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..schemas import ColumnMapping
+
+
+ADDITIVE_FIELDS = (
+    "spend",
+    "impressions",
+    "clicks",
+    "purchases",
+    "purchase_value",
+    "adds_to_cart",
+)
+
+# Derived columns are filled per group, so a precomputed ctr_7d is never
+# paired with a derived ctr_prev_7d.
+DERIVED_GROUPS: Tuple[Tuple[str, ...], ...] = (
+    ("ctr_7d", "ctr_prev_7d"),
+    ("frequency_growth",),
+    ("spend_pacing",),
+)
+
+
+@dataclass
+class TimeSeriesResult:
+    frame: pd.DataFrame
+    mapping: ColumnMapping
+    daily: pd.DataFrame
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+class TimeSeriesAgent:
+    """Collapse daily rows into entities with rolling fatigue signals.
+
+    Exports with a single date per entity (e.g. a constant ``Reporting starts``
+    column) are left untouched. Rows whose date does not parse still count
+    towards entity totals but not towards the rolling windows.
+    """
+
+    def __init__(self, mapping: ColumnMapping, window_days: int = 7) -> None:
+        self.mapping = mapping
+        self.window_days = window_days
+
+    def run(self, frame: pd.DataFrame) -> TimeSeriesResult:
+        passthrough = TimeSeriesResult(frame=frame, mapping=self.mapping, daily=pd.DataFrame())
+        if not self.mapping.date:
+            return passthrough
+
+        # Offset-aware dates are normalized to naive UTC so days are datetime64.
+        dates = pd.to_datetime(
+            frame[self.mapping.date], errors="coerce", utc=True
+        ).dt.tz_convert(None)
+        dated = dates.notna().to_numpy()
+        if not dated.any():
+            return passthrough
+
+        df = frame.copy()
+        entity_columns: List[str] = [
+            column
+            for column in [
+                self.mapping.campaign_name,
+                self.mapping.adset_name,
+                self.mapping.ad_name,
+                self.mapping.ad_id,
+            ]
+            if column
+        ]
+        if entity_columns:
+            codes = (
+                df.groupby(entity_columns, sort=False, dropna=False)
+                .ngroup()
+                .to_numpy(dtype=np.int64)
+            )
+        else:
+            codes = np.zeros(len(df), dtype=np.int64)
+        n_entities = int(codes.max()) + 1
+
+        day = np.zeros(len(df), dtype=np.int64)
+        day[dated] = dates[dated].to_numpy().astype("datetime64[D]").astype(np.int64)
+
+        # One composite key per entity-day; entities are spaced far enough apart
+        # that no look-back window can reach into the previous entity's days.
+        first_day = int(day[dated].min())
+        span = int(day[dated].max()) - first_day + 1
+        stride = span + 2 * self.window_days
+        keys = codes[dated] * stride + (day[dated] - first_day)
+
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        if len(unique_keys) == len(np.unique(codes[dated])):
+            return passthrough
+        n_days = len(unique_keys)
+
+        def numeric(column: Optional[str]) -> np.ndarray:
+            if column is None:
+                return np.zeros(len(df))
+            return pd.to_numeric(df[column], errors="coerce").fillna(0.0).to_numpy(
+                dtype=float
+            )
+
+        row_values = {
+            field: numeric(getattr(self.mapping, field)) for field in ADDITIVE_FIELDS
+        }
+        impressions = row_values["impressions"]
+        if self.mapping.frequency:
+            frequency = pd.to_numeric(df[self.mapping.frequency], errors="coerce").to_numpy(
+                dtype=float
+            )
+            frequency_weight = np.where(np.isnan(frequency), 0.0, impressions)
+            frequency_weighted = np.nan_to_num(frequency) * frequency_weight
+        else:
+            frequency_weight = np.zeros(len(df))
+            frequency_weighted = np.zeros(len(df))
+
+        def daily_sum(values: np.ndarray) -> np.ndarray:
+            return np.bincount(inverse, weights=values[dated], minlength=n_days)
+
+        daily: Dict[str, np.ndarray] = {
+            field: daily_sum(values) for field, values in row_values.items()
+        }
+        freq_weighted = daily_sum(frequency_weighted)
+        freq_weight = daily_sum(frequency_weight)
+
+        end = np.arange(1, n_days + 1)
+        current_start = np.searchsorted(
+            unique_keys, unique_keys - (self.window_days - 1), side="left"
+        )
+        prior_start = np.searchsorted(
+            unique_keys, unique_keys - (2 * self.window_days - 1), side="left"
+        )
+
+        def windows(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+            csum = np.concatenate(([0.0], np.cumsum(values)))
+            return csum[end] - csum[current_start], csum[current_start] - csum[prior_start]
+
+        clicks_7d, clicks_prev_7d = windows(daily["clicks"])
+        impressions_7d, impressions_prev_7d = windows(daily["impressions"])
+        spend_7d, spend_prev_7d = windows(daily["spend"])
+        freq_num_7d, freq_num_prev_7d = windows(freq_weighted)
+        freq_den_7d, freq_den_prev_7d = windows(freq_weight)
+
+        frequency_7d = _ratio(freq_num_7d, freq_den_7d)
+        frequency_prev_7d = _ratio(freq_num_prev_7d, freq_den_prev_7d)
+
+        daily_frame = pd.DataFrame(
+            {
+                "entity": unique_keys // stride,
+                "date": (unique_keys % stride + first_day).astype("datetime64[D]"),
+                **daily,
+                "ctr_7d": _ratio(clicks_7d, impressions_7d),
+                "ctr_prev_7d": _ratio(clicks_prev_7d, impressions_prev_7d),
+                "frequency_7d": frequency_7d,
+                "frequency_prev_7d": frequency_prev_7d,
+                "frequency_growth": _ratio(frequency_7d, frequency_prev_7d) - 1.0,
+                "spend_7d": spend_7d,
+                "spend_prev_7d": spend_prev_7d,
+                "spend_pacing": _ratio(spend_7d, spend_prev_7d),
+            }
+        )
+
+        # Each entity is summarised by its windows as of its latest active day.
+        entity_of_day = daily_frame["entity"].to_numpy()
+        is_last = np.append(entity_of_day[1:] != entity_of_day[:-1], True)
+        latest = daily_frame.loc[is_last].set_index("entity").reindex(range(n_entities))
+
+        # Undated rows sort first within an entity, so a dated row is kept as
+        # the representative whenever one exists.
+        order = np.lexsort((day, dated, codes))
+        collapsed = df.iloc[order].copy()
+        collapsed["__entity"] = codes[order]
+        collapsed = collapsed.drop_duplicates("__entity", keep="last").set_index(
+            "__entity"
+        )
+        for field, values in row_values.items():
+            column = getattr(self.mapping, field)
+            if column:
+                collapsed[column] = np.bincount(codes, weights=values, minlength=n_entities)[
+                    collapsed.index
+                ]
+
+        derived: Dict[str, str] = {}
+        for group in DERIVED_GROUPS:
+            if all(getattr(self.mapping, field) for field in group):
+                continue  # keep the export's precomputed window columns
+            for field in group:
+                collapsed[field] = latest[field]
+                derived[field] = field
+        collapsed = collapsed.reset_index(drop=True)
+
+        mapping = self.mapping.model_copy(update=derived)
+        return TimeSeriesResult(frame=collapsed, mapping=mapping, daily=daily_frame)
@@ -0,0 +1,425 @@
+from __future__ import annotations
+
+import glob
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+)
+
+import pandas as pd
+
+from .engine import InsightAgentEngine
+from .schemas import InsightAgentConfig, InsightAgentRequest
+
+
+MANIFEST_NAME = "_manifest.jsonl"
+GLOB_CHARACTERS = set("*?[")
+
+
+@dataclass(frozen=True)
+class ExportFile:
+    path: str
+    size: int
+    mtime: float
+
+
+@dataclass
+class BatchStats:
+    files: int = 0
+    rows: int = 0
+    errors: int = 0
+    skipped: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.perf_counter() - self.started, 1e-9)
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.elapsed
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed
+
+
+def _scan_directory(root: str, pattern: str) -> List[ExportFile]:
+    found: List[ExportFile] = []
+    pending = [root]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file() and fnmatch(entry.name, pattern):
+                    stat = entry.stat()
+                    found.append(ExportFile(entry.path, stat.st_size, stat.st_mtime))
+    return found
+
+
+def scan_exports(
+    sources: Iterable[str], pattern: str = "*.csv", workers: int = 8
+) -> List[ExportFile]:
+    """Expand directories and globs into export files, walking subtrees in parallel."""
+
+    files: List[ExportFile] = []
+    roots: List[str] = []
+    for source in sources:
+        if GLOB_CHARACTERS & set(source):
+            for match in glob.glob(source, recursive=True):
+                if os.path.isfile(match):
+                    stat = os.stat(match)
+                    files.append(ExportFile(match, stat.st_size, stat.st_mtime))
+        elif os.path.isdir(source):
+            with os.scandir(source) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        roots.append(entry.path)
+                    elif entry.is_file() and fnmatch(entry.name, pattern):
+                        stat = entry.stat()
+                        files.append(ExportFile(entry.path, stat.st_size, stat.st_mtime))
+        elif os.path.isfile(source):
+            stat = os.stat(source)
+            files.append(ExportFile(source, stat.st_size, stat.st_mtime))
+        else:
+            raise FileNotFoundError(f"No such export file or directory: '{source}'.")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for found in pool.map(lambda root: _scan_directory(root, pattern), roots):
+            files.extend(found)
+
+    # Canonical paths keep manifest lookups stable across cwd and spelling.
+    unique = {
+        os.path.realpath(export.path): export for export in files
+    }
+    return [
+        ExportFile(path, unique[path].size, unique[path].mtime) for path in sorted(unique)
+    ]
+
+
+_worker_engine: Optional[InsightAgentEngine] = None
+_worker_overrides: Dict[str, Any] = {}
+
+
+def _init_worker(config: Dict[str, Any], overrides: Dict[str, Any]) -> None:
+    global _worker_engine, _worker_overrides
+    _worker_engine = InsightAgentEngine(InsightAgentConfig(**config))
+    _worker_overrides = overrides
+
+
+def _error_record(export: ExportFile, error: str) -> Dict[str, Any]:
+    return {"file": export.path, "rows": 0, "status": "error", "error": error}
+
+
+def _analyze_export(export: ExportFile) -> Dict[str, Any]:
+    assert _worker_engine is not None, "worker engine not initialised"
+    record: Dict[str, Any] = {"file": export.path, "rows": 0}
+    try:
+        frame = pd.read_csv(export.path)
+        record["rows"] = len(frame)
+        request = InsightAgentRequest(
+            dataset_name=Path(export.path).stem,
+            records=frame.to_dict(orient="records"),
+            **_worker_overrides,
+        )
+        response = _worker_engine.analyze(request)
+    except Exception as exc:  # noqa: BLE001 - one bad export must not stop a backfill
+        record.update(status="error", error=f"{type(exc).__name__}: {exc}")
+        return record
+
+    record.update(
+        status="ok",
+        dataset_name=request.dataset_name,
+        metrics_snapshot=response.metrics_snapshot,
+        insights=[insight.model_dump() for insight in response.insights],
+        rollups=[node.model_dump() for node in response.rollups],
+        column_mapping=response.resolved_context.column_mapping.model_dump(
+            exclude_none=True
+        ),
+        failed_columns=response.resolved_context.failed_columns,
+    )
+    if response.approximation is not None:
+        record["approximation"] = response.approximation.model_dump()
+    return record
+
+
+class Manifest:
+    """Append-only checkpoint of exports whose results have been committed.
+
+    The latest entry per file is the source of truth: when an export is
+    re-analyzed, its new record lands in a later partition and the earlier
+    one is superseded (see :func:`read_results`).
+    """
+
+    def __init__(self, output_dir: Path) -> None:
+        self.path = output_dir / MANIFEST_NAME
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._torn = False
+        if self.path.exists():
+            with self.path.open("rb") as handle:
+                handle.seek(0, os.SEEK_END)
+                if handle.tell():
+                    handle.seek(-1, os.SEEK_END)
+                    self._torn = handle.read(1) != b"\n"
+            with self.path.open() as handle:
+                for line in handle:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn final line from an interrupted run
+                    self.entries[os.path.realpath(entry["file"])] = entry
+
+    def is_done(self, export: ExportFile, retry_errors: bool = False) -> bool:
+        entry = self.entries.get(os.path.realpath(export.path))
+        if entry is None:
+            return False
+        if entry["size"] != export.size or entry["mtime"] != export.mtime:
+            return False
+        return not (retry_errors and entry["status"] == "error")
+
+    def next_partition(self) -> int:
+        partitions = [entry.get("partition", -1) for entry in self.entries.values()]
+        return max(partitions, default=-1) + 1
+
+    def commit(self, entries: Sequence[Dict[str, Any]]) -> None:
+        with self.path.open("a") as handle:
+            if self._torn:
+                handle.write("\n")
+                self._torn = False
+            for entry in entries:
+                handle.write(json.dumps(entry) + "\n")
+                self.entries[os.path.realpath(entry["file"])] = entry
+            handle.flush()
+            os.fsync(handle.fileno())
+
+
+class PartitionWriter:
+    """Buffer results and publish them as numbered NDJSON or Parquet partitions."""
+
+    def __init__(self, output_dir: Path, output_format: str, first_partition: int) -> None:
+        if output_format not in {"ndjson", "parquet"}:
+            raise ValueError(f"Unsupported output format '{output_format}'.")
+        if output_format == "parquet":
+            try:
+                import pyarrow  # type: ignore  # noqa: F401
+            except ImportError as exc:  # pragma: no cover - optional dependency
+                raise RuntimeError(
+                    "pyarrow package is required for Parquet output."
+                ) from exc
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.partition = first_partition
+
+    def write(self, records: Sequence[Dict[str, Any]]) -> str:
+        name = f"part-{self.partition:05d}.{self.output_format}"
+        target = self.output_dir / name
+        staging = self.output_dir / f".{name}.tmp"
+        records = [{**record, "partition": self.partition} for record in records]
+        if self.output_format == "ndjson":
+            with staging.open("w") as handle:
+                for record in records:
+                    handle.write(json.dumps(record, default=str) + "\n")
+        else:
+            flat = [
+                {
+                    key: json.dumps(value, default=str)
+                    if isinstance(value, (dict, list))
+                    else value
+                    for key, value in record.items()
+                }
+                for record in records
+            ]
+            pd.DataFrame(flat).to_parquet(staging, index=False)
+        os.replace(staging, target)
+        self.partition += 1
+        return name
+
+
+class BatchRunner:
+    """Analyze many exports across a process pool with resumable checkpoints."""
+
+    def __init__(
+        self,
+        output_dir: str | Path,
+        config: Optional[InsightAgentConfig] = None,
+        request_overrides: Optional[Dict[str, Any]] = None,
+        workers: int = 1,
+        output_format: str = "ndjson",
+        partition_size: int = 500,
+        retry_errors: bool = False,
+        report: Optional[Callable[[BatchStats, int], None]] = None,
+        report_interval: float = 5.0,
+        commit_interval: float = 60.0,
+    ) -> None:
+        self.output_dir = Path(output_dir)
+        self.config = config or InsightAgentConfig()
+        self.request_overrides = request_overrides or {}
+        self.workers = workers
+        self.output_format = output_format
+        self.partition_size = partition_size
+        self.retry_errors = retry_errors
+        self.report = report
+        self.report_interval = report_interval
+        self.commit_interval = commit_interval
+
+    def run(self, exports: Sequence[ExportFile]) -> BatchStats:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        manifest = Manifest(self.output_dir)
+        writer = PartitionWriter(
+            self.output_dir, self.output_format, manifest.next_partition()
+        )
+
+        stats = BatchStats()
+        pending = [
+            export for export in exports if not manifest.is_done(export, self.retry_errors)
+        ]
+        stats.skipped = len(exports) - len(pending)
+        by_path = {export.path: export for export in pending}
+
+        buffer: List[Dict[str, Any]] = []
+        last_report = last_commit = time.perf_counter()
+
+        def flush() -> None:
+            nonlocal last_commit
+            last_commit = time.perf_counter()
+            if not buffer:
+                return
+            partition = writer.partition
+            name = writer.write(buffer)
+            manifest.commit(
+                [
+                    {
+                        "file": record["file"],
+                        "size": by_path[record["file"]].size,
+                        "mtime": by_path[record["file"]].mtime,
+                        "status": record["status"],
+                        "rows": record["rows"],
+                        "partition": partition,
+                        "output": name,
+                    }
+                    for record in buffer
+                ]
+            )
+            buffer.clear()
+
+        try:
+            for record in self._results(pending):
+                buffer.append(record)
+                stats.files += 1
+                stats.rows += record["rows"]
+                stats.errors += record["status"] == "error"
+                now = time.perf_counter()
+                # Publish partial partitions too, so a killed run loses at most
+                # ``commit_interval`` seconds of work.
+                if (
+                    len(buffer) >= self.partition_size
+                    or now - last_commit >= self.commit_interval
+                ):
+                    flush()
+                if self.report and now - last_report >= self.report_interval:
+                    self.report(stats, len(pending))
+                    last_report = now
+        finally:
+            # Commit whatever finished so an interrupted run resumes from here.
+            flush()
+        if self.report:
+            self.report(stats, len(pending))
+        return stats
+
+    def _results(self, exports: Sequence[ExportFile]) -> Iterator[Dict[str, Any]]:
+        init_args = (self.config.model_dump(), self.request_overrides)
+        if self.workers <= 1:
+            _init_worker(*init_args)
+            for export in exports:
+                yield _analyze_export(export)
+            return
+
+        queue = deque(exports)
+        while queue:
+            suspects = yield from self._pool_results(queue, self.workers, init_args)
+            # A worker died and broke the pool. Re-run the exports that were in
+            # flight one at a time, so only the one that kills its worker is
+            # recorded as failed, then carry on with a fresh pool.
+            for export in suspects:
+                if (yield from self._pool_results(deque([export]), 1, init_args)):
+                    yield _error_record(
+                        export, "BrokenProcessPool: worker process died analyzing this export"
+                    )
+
+    @staticmethod
+    def _pool_results(
+        queue: Deque[ExportFile], workers: int, init_args: tuple
+    ) -> Generator[Dict[str, Any], None, List[ExportFile]]:
+        """Drain ``queue`` through a pool; return the exports in flight if it breaks."""
+
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=init_args
+        )
+        in_flight: Dict[Future, ExportFile] = {}
+        suspects: List[ExportFile] = []
+        try:
+            while (queue or in_flight) and not suspects:
+                while queue and len(in_flight) < 2 * workers:
+                    export = queue.popleft()
+                    in_flight[pool.submit(_analyze_export, export)] = export
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                if any(isinstance(future.exception(), BrokenProcessPool) for future in done):
+                    # Every other in-flight future fails promptly as well.
+                    done, _ = wait(in_flight)
+                for future in done:
+                    export = in_flight.pop(future)
+                    error = future.exception()
+                    if isinstance(error, BrokenProcessPool):
+                        suspects.append(export)
+                    elif error is not None:
+                        yield _error_record(export, f"{type(error).__name__}: {error}")
+                    else:
+                        yield future.result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        return suspects
+
+
+def read_results(output_dir: str | Path) -> Iterator[Dict[str, Any]]:
+    """Yield the current record for every export, skipping superseded ones."""
+
+    output_dir = Path(output_dir)
+    current = {
+        (path, entry["partition"]) for path, entry in Manifest(output_dir).entries.items()
+    }
+    for part in sorted(output_dir.glob("part-*")):
+        if part.suffix == ".ndjson":
+            with part.open() as handle:
+                records = [json.loads(line) for line in handle if line.strip()]
+        else:
+            records = pd.read_parquet(part).to_dict(orient="records")
+        for record in records:
+            if (os.path.realpath(record["file"]), record["partition"]) in current:
+                yield record
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from rich.console import Console
+
+from .batch import BatchRunner, BatchStats, scan_exports
+from .schemas import InsightAgentConfig
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="insight-agent",
+        description="Analyze archived paid media exports in bulk.",
+    )
+    parser.add_argument(
+        "sources",
+        nargs="+",
+        help="Export files, directories (scanned recursively) or glob patterns.",
+    )
+    parser.add_argument("-o", "--output", required=True, help="Output directory.")
+    parser.add_argument(
+        "--pattern", default="*.csv", help="File name pattern used when scanning directories."
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes; each loads the engine once.",
+    )
+    parser.add_argument("--format", choices=("ndjson", "parquet"), default="ndjson")
+    parser.add_argument(
+        "--partition-size", type=int, default=500, help="Results per output partition."
+    )
+    parser.add_argument(
+        "--data-source",
+        choices=("meta_ads", "tiktok_ads", "google_ads", "unknown"),
+        default="unknown",
+    )
+    parser.add_argument(
+        "--column-overrides",
+        type=json.loads,
+        default=None,
+        help="JSON object mapping canonical column names to export columns.",
+    )
+    parser.add_argument(
+        "--config",
+        type=json.loads,
+        default=None,
+        help="JSON object of InsightAgentConfig overrides.",
+    )
+    parser.add_argument(
+        "--retry-errors", action="store_true", help="Re-run exports that failed previously."
+    )
+    parser.add_argument(
+        "--report-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between throughput reports.",
+    )
+    parser.add_argument(
+        "--commit-interval",
+        type=float,
+        default=60.0,
+        help="Maximum seconds between manifest commits, even for partial partitions.",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    console = Console(stderr=True)
+
+    exports = scan_exports(args.sources, pattern=args.pattern)
+    console.log(f"Found {len(exports)} export(s).")
+
+    request_overrides: Dict[str, Any] = {"data_source": args.data_source}
+    if args.column_overrides:
+        request_overrides["manual_column_overrides"] = args.column_overrides
+
+    def report(stats: BatchStats, total: int) -> None:
+        console.log(
+            f"{stats.files}/{total} files ({stats.errors} failed) · "
+            f"{stats.files_per_second:,.1f} files/s · {stats.rows_per_second:,.0f} rows/s"
+        )
+
+    runner = BatchRunner(
+        output_dir=args.output,
+        config=InsightAgentConfig(**(args.config or {})),
+        request_overrides=request_overrides,
+        workers=args.workers,
+        output_format=args.format,
+        partition_size=args.partition_size,
+        retry_errors=args.retry_errors,
+        report=report,
+        report_interval=args.report_interval,
+        commit_interval=args.commit_interval,
+    )
+    stats = runner.run(exports)
+    if stats.skipped:
+        console.log(f"Skipped {stats.skipped} export(s) already in the manifest.")
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
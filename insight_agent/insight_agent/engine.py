@@ -1,17 +1,66 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import time
+import warnings
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
 
-from .graph import WorkflowState, build_graph
+import numpy as np
+
+from .graph import ANALYSIS_STAGES, PREPARE_STAGES, WorkflowState, build_graph
 from .schemas import InsightAgentConfig, InsightAgentRequest, InsightAgentResponse
 
 
+# Smallest sample an approximate pass draws, even when the latency budget is
+# already spent; also the size of the calibration pass on a fresh engine.
+MIN_SAMPLE_SIZE = 500
+
+
+class PassCostModel:
+    """Analysis-pass latency as a fixed overhead plus a per-sampled-row cost."""
+
+    def __init__(self, history: int = 8) -> None:
+        self._observations: Deque[Tuple[int, float]] = deque(maxlen=history)
+
+    @property
+    def known(self) -> bool:
+        return bool(self._observations)
+
+    def observe(self, rows: int, elapsed_ms: float) -> None:
+        self._observations.append((max(rows, 1), elapsed_ms))
+
+    def coefficients(self) -> Tuple[float, float]:
+        rows = np.array([rows for rows, _ in self._observations], dtype=float)
+        elapsed = np.array([ms for _, ms in self._observations], dtype=float)
+        if np.ptp(rows) > 0:
+            per_row, fixed = np.polyfit(rows, elapsed, 1)
+            if per_row > 0:
+                return max(float(fixed), 0.0), float(per_row)
+        # A single pass size cannot separate the two terms; charging its full
+        # cost to both can only overestimate.
+        return float(elapsed.max()), float((elapsed / rows).max())
+
+    def predict(self, rows: int) -> float:
+        fixed, per_row = self.coefficients()
+        return fixed + per_row * rows
+
+    def affordable(self, budget_ms: float) -> int:
+        """Largest sample whose predicted pass latency fits ``budget_ms``."""
+
+        fixed, per_row = self.coefficients()
+        return max(int((budget_ms - fixed) / per_row), 0)
+
+
 class InsightAgentEngine:
     """High-level façade orchestrating the InsightAgent workflow."""
 
     def __init__(self, config: Optional[InsightAgentConfig] = None) -> None:
         self.config = config or InsightAgentConfig()
         self._graph: Any = self._compile_graph()
+        self._prepare_graph: Any = build_graph(PREPARE_STAGES).compile()
+        self._analysis_graph: Any = build_graph(ANALYSIS_STAGES).compile()
+        # Pass latencies observed by earlier approximate runs.
+        self._pass_cost = PassCostModel()
 
     def _compile_graph(self):
         workflow = build_graph()
@@ -20,13 +69,103 @@ class InsightAgentEngine:
     def analyze(
         self, request: InsightAgentRequest, runtime_overrides: Optional[Dict[str, Any]] = None
     ) -> InsightAgentResponse:
+        response: Optional[InsightAgentResponse] = None
+        for response in self.analyze_progressive(request, runtime_overrides):
+            pass
+        assert response is not None
+        return response
+
+    def analyze_progressive(
+        self, request: InsightAgentRequest, runtime_overrides: Optional[Dict[str, Any]] = None
+    ) -> Iterator[InsightAgentResponse]:
+        """Yield a quick approximate response, then a refined one if time allows.
+
+        Exact analyses yield a single response. In approximate mode the input is
+        loaded, resolved and collapsed once; each pass only re-runs sampling,
+        metrics and rules. With ``latency_budget_ms`` set, passes are sized
+        from a fixed-plus-per-row cost model fitted to earlier passes on this
+        engine: a fresh engine first runs a ``MIN_SAMPLE_SIZE`` calibration
+        pass, and a pass predicted to overrun the remaining budget is never
+        started. Without a budget the sample grows by ``refinement_factor``.
+        """
+
         config = self.config.model_copy(update=runtime_overrides or {})
+        if not config.approximate:
+            yield self._graph.invoke({"request": request, "config": config})["response"]
+            return
+
+        started = time.perf_counter()
+        prepared: WorkflowState = self._prepare_graph.invoke(
+            {"request": request, "config": config}
+        )
+
+        def remaining_ms() -> float:
+            assert config.latency_budget_ms is not None
+            return config.latency_budget_ms - (time.perf_counter() - started) * 1000
+
+        sample_size = config.sample_size
+        if config.latency_budget_ms is not None:
+            if remaining_ms() <= 0:
+                warnings.warn(
+                    f"Latency budget of {config.latency_budget_ms:g} ms was spent "
+                    f"before sampling; analyzing {MIN_SAMPLE_SIZE} rows.",
+                    RuntimeWarning,
+                    stacklevel=2,
+                )
+            if self._pass_cost.known:
+                # Leave most of the budget for the refinement pass.
+                affordable = self._pass_cost.affordable(remaining_ms() / 4)
+            else:
+                affordable = MIN_SAMPLE_SIZE
+            sample_size = min(sample_size, max(affordable, MIN_SAMPLE_SIZE))
+
+        response = self._run_pass(prepared, config, sample_size)
+        yield self._stamp(response, passes=1, started=started, config=config)
 
-        initial_state: WorkflowState = {
-            "request": request,
-            "config": config,
-        }
+        report = response.approximation
+        assert report is not None
+        if report.rows_sampled >= report.rows_total:
+            return
 
-        result_state = self._graph.invoke(initial_state)
-        response = result_state["response"]
+        if config.latency_budget_ms is None:
+            next_size = int(report.rows_sampled * config.refinement_factor)
+        else:
+            # Keep some headroom for the cost model being optimistic.
+            next_size = self._pass_cost.affordable(0.7 * remaining_ms())
+            if next_size < report.rows_sampled * 1.5:
+                return
+
+        refined = self._run_pass(prepared, config, min(next_size, report.rows_total))
+        yield self._stamp(refined, passes=2, started=started, config=config)
+
+    def _run_pass(
+        self, prepared: WorkflowState, config: InsightAgentConfig, sample_size: int
+    ) -> InsightAgentResponse:
+        pass_config = config.model_copy(update={"sample_size": sample_size})
+        pass_started = time.perf_counter()
+        result_state = self._analysis_graph.invoke({**prepared, "config": pass_config})
+        response: InsightAgentResponse = result_state["response"]
+
+        assert response.approximation is not None
+        elapsed_ms = (time.perf_counter() - pass_started) * 1000
+        self._pass_cost.observe(response.approximation.rows_sampled, elapsed_ms)
         return response
+
+    @staticmethod
+    def _stamp(
+        response: InsightAgentResponse,
+        passes: int,
+        started: float,
+        config: InsightAgentConfig,
+    ) -> InsightAgentResponse:
+        assert response.approximation is not None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        approximation = response.approximation.model_copy(
+            update={
+                "passes": passes,
+                "elapsed_ms": elapsed_ms,
+                "over_budget": config.latency_budget_ms is not None
+                and elapsed_ms > config.latency_budget_ms,
+            }
+        )
+        return response.model_copy(update={"approximation": approximation})
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Dict, TypedDict
+from typing import Any, Dict, List, Sequence, TypedDict
 
 import pandas as pd
 from langgraph.graph import END, StateGraph
@@ -8,11 +8,15 @@ from langgraph.graph import END, StateGraph
 from .agents.column_resolver import ColumnResolver
 from .agents.metrics_agent import MetricsAgent
 from .agents.recommendation_agent import RecommendationAgent
+from .agents.sampling_agent import SamplingAgent, SamplingResult, estimate_intervals
+from .agents.timeseries_agent import TimeSeriesAgent
 from .schemas import (
+    ApproximationReport,
     InsightAgentConfig,
     InsightAgentRequest,
     InsightAgentResponse,
     ResolvedContext,
+    RollupNode,
 )
 
 
@@ -22,11 +26,26 @@ class WorkflowState(TypedDict, total=False):
     frame: pd.DataFrame
     resolved_context: ResolvedContext
     metrics_snapshot: Dict[str, Any]
+    rollups: List[RollupNode]
+    sampling: SamplingResult
+    approximation: ApproximationReport
     insights: Any
     response: InsightAgentResponse
 
 
-def build_graph() -> StateGraph[WorkflowState]:
+PREPARE_STAGES = ("load_input", "resolve_columns", "timeseries")
+ANALYSIS_STAGES = ("sample", "metrics", "recommendations", "finalize")
+
+
+def build_graph(
+    stages: Sequence[str] = PREPARE_STAGES + ANALYSIS_STAGES,
+) -> StateGraph[WorkflowState]:
+    """Chain the given workflow stages in order.
+
+    Approximate runs compile the prepare and analysis stages separately so
+    refinement passes can reuse the loaded and resolved frame.
+    """
+
     workflow = StateGraph(WorkflowState)
 
     def node_load_input(state: WorkflowState) -> WorkflowState:
@@ -42,7 +61,13 @@ def build_graph() -> StateGraph[WorkflowState]:
 
         result = resolver.resolve(state["frame"].columns)
 
-        normalized_rows = state["frame"].to_dict(orient="records")
+        # Approximate runs only echo the rows they sample (see node_sample), so
+        # nothing before sampling has to walk the frame row by row.
+        normalized_rows = (
+            []
+            if state["config"].approximate
+            else state["frame"].to_dict(orient="records")
+        )
         state["resolved_context"] = ResolvedContext(
             column_mapping=result.mapping,
             normalized_rows=normalized_rows,
@@ -50,11 +75,62 @@ def build_graph() -> StateGraph[WorkflowState]:
         )
         return state
 
+    def node_timeseries(state: WorkflowState) -> WorkflowState:
+        context = state["resolved_context"]
+        agent = TimeSeriesAgent(mapping=context.column_mapping)
+        result = agent.run(state["frame"])
+        state["frame"] = result.frame
+        state["resolved_context"] = context.model_copy(
+            update={
+                "column_mapping": result.mapping,
+                "failed_columns": [
+                    column
+                    for column in context.failed_columns
+                    if getattr(result.mapping, column, None) is None
+                ],
+            }
+        )
+        return state
+
+    def node_sample(state: WorkflowState) -> WorkflowState:
+        config = state["config"]
+        if not config.approximate:
+            return state
+
+        agent = SamplingAgent(
+            mapping=state["resolved_context"].column_mapping,
+            sample_size=config.sample_size,
+            seed=config.sample_seed,
+        )
+        result = agent.run(state["frame"])
+        state["frame"] = result.frame
+        state["sampling"] = result
+        state["resolved_context"] = state["resolved_context"].model_copy(
+            update={"normalized_rows": result.frame.to_dict(orient="records")}
+        )
+        return state
+
     def node_metrics(state: WorkflowState) -> WorkflowState:
         mapping = state["resolved_context"].column_mapping
-        agent = MetricsAgent(mapping=mapping)
-        metrics_result = agent.run(state["frame"])
+        sampling = state.get("sampling")
+        agent = MetricsAgent(mapping=mapping, rollup_depth=state["config"].rollup_depth)
+        metrics_result = agent.run(
+            state["frame"], weights=sampling.weights if sampling else None
+        )
         state["metrics_snapshot"] = metrics_result.summary
+        state["rollups"] = metrics_result.rollups
+
+        if sampling is not None:
+            confidence_level = state["config"].confidence_level
+            state["approximation"] = ApproximationReport(
+                rows_total=sampling.rows_total,
+                rows_sampled=sampling.rows_sampled,
+                sample_fraction=sampling.rows_sampled / max(sampling.rows_total, 1),
+                confidence_level=confidence_level,
+                confidence_intervals=estimate_intervals(
+                    sampling, metrics_result.entity_metrics, confidence_level
+                ),
+            )
 
         entity_frame = metrics_result.entity_metrics.rename(
             columns={
@@ -68,8 +144,12 @@ def build_graph() -> StateGraph[WorkflowState]:
         return state
 
     def node_recommendations(state: WorkflowState) -> WorkflowState:
-        agent = RecommendationAgent()
-        state["insights"] = agent.run(state["frame"])
+        config = state["config"]
+        agent = RecommendationAgent(
+            roas_guardrail=config.roas_guardrail,
+            rollup_levels=config.rollup_rule_levels,
+        )
+        state["insights"] = agent.run(state["frame"], rollups=state.get("rollups"))
         return state
 
     def node_finalize(state: WorkflowState) -> WorkflowState:
@@ -79,6 +159,8 @@ def build_graph() -> StateGraph[WorkflowState]:
             resolved_context=state["resolved_context"],
             insights=state["insights"],
             metrics_snapshot=state["metrics_snapshot"],
+            rollups=state.get("rollups", []),
+            approximation=state.get("approximation"),
         )
         next_state: WorkflowState = {
             **state,
@@ -86,17 +168,21 @@ def build_graph() -> StateGraph[WorkflowState]:
         }
         return next_state
 
-    workflow.add_node("load_input", node_load_input)
-    workflow.add_node("resolve_columns", node_resolve_columns)
-    workflow.add_node("metrics", node_metrics)
-    workflow.add_node("recommendations", node_recommendations)
-    workflow.add_node("finalize", node_finalize)
-
-    workflow.set_entry_point("load_input")
-    workflow.add_edge("load_input", "resolve_columns")
-    workflow.add_edge("resolve_columns", "metrics")
-    workflow.add_edge("metrics", "recommendations")
-    workflow.add_edge("recommendations", "finalize")
-    workflow.add_edge("finalize", END)
+    nodes = {
+        "load_input": node_load_input,
+        "resolve_columns": node_resolve_columns,
+        "timeseries": node_timeseries,
+        "sample": node_sample,
+        "metrics": node_metrics,
+        "recommendations": node_recommendations,
+        "finalize": node_finalize,
+    }
+    for stage in stages:
+        workflow.add_node(stage, nodes[stage])
+
+    workflow.set_entry_point(stages[0])
+    for current, following in zip(stages, stages[1:]):
+        workflow.add_edge(current, following)
+    workflow.add_edge(stages[-1], END)
 
     return workflow
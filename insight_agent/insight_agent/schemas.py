@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Dict, List, Literal, Optional, Sequence
+from typing import Dict, List, Literal, Optional, Sequence, Tuple
 
 from pydantic import BaseModel, Field, model_validator
 
@@ -14,6 +14,27 @@ class InsightAgentConfig(BaseModel):
     top_p: float = 1.0
     max_tokens: int = 1024
     semantic_column_threshold: float = 0.6
+    rollup_depth: Literal["campaign", "adset", "ad"] = Field(
+        "adset", description="Deepest hierarchy level included in response rollups."
+    )
+    rollup_rule_levels: List[Literal["campaign", "adset", "ad"]] = Field(
+        default_factory=lambda: ["campaign", "adset"],
+        description="Rollup levels evaluated by the recommendation rules.",
+    )
+    roas_guardrail: float = Field(1.5, gt=0, description="ROAS below which rules fire.")
+    approximate: bool = Field(
+        False,
+        description="Analyze a spend-weighted stratified sample instead of every row.",
+    )
+    sample_size: int = Field(20_000, gt=0, description="Rows drawn in the first approximate pass.")
+    refinement_factor: float = Field(
+        4.0, gt=1.0, description="Sample growth for the refinement pass when no latency budget is set."
+    )
+    latency_budget_ms: Optional[float] = Field(
+        None, gt=0, description="Wall-clock budget used to size approximate passes."
+    )
+    confidence_level: float = Field(0.95, gt=0, lt=1)
+    sample_seed: int = 0
 
 
 class InsightAgentRequest(BaseModel):
@@ -45,6 +66,8 @@ class ColumnMapping(BaseModel):
     clicks: str
     ctr: Optional[str] = None
     frequency: Optional[str] = None
+    frequency_growth: Optional[str] = None
+    spend_pacing: Optional[str] = None
     roas: Optional[str] = None
     purchases: Optional[str] = None
     purchase_value: Optional[str] = None
@@ -52,6 +75,7 @@ class ColumnMapping(BaseModel):
     ctr_7d: Optional[str] = None
     ctr_prev_7d: Optional[str] = None
     status: Optional[str] = None
+    date: Optional[str] = None
     ad_name: Optional[str] = None
     ad_id: Optional[str] = None
     campaign_name: Optional[str] = None
@@ -83,10 +107,36 @@ class InsightAgentInsight(BaseModel):
     supporting_data: Dict[str, object] = Field(default_factory=dict)
 
 
+class RollupNode(BaseModel):
+    """Aggregated metrics for one campaign, ad set or ad in the hierarchy."""
+
+    level: Literal["campaign", "adset", "ad"]
+    name: str
+    metrics: Dict[str, float]
+    children: List["RollupNode"] = Field(default_factory=list)
+
+
+class ApproximationReport(BaseModel):
+    """Sampling details and confidence intervals for approximate responses."""
+
+    rows_total: int
+    rows_sampled: int
+    sample_fraction: float
+    confidence_level: float
+    confidence_intervals: Dict[str, Tuple[float, float]]
+    passes: int = 1
+    elapsed_ms: float = 0.0
+    over_budget: bool = Field(
+        False, description="Whether this pass finished after ``latency_budget_ms``."
+    )
+
+
 class InsightAgentResponse(BaseModel):
     request: InsightAgentRequest
     config: InsightAgentConfig
     resolved_context: ResolvedContext
     insights: List[InsightAgentInsight]
     metrics_snapshot: Dict[str, object]
+    rollups: List[RollupNode] = Field(default_factory=list)
+    approximation: Optional[ApproximationReport] = None
 
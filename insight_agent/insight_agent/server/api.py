@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Query
 
 from ..engine import InsightAgentEngine
 from ..schemas import InsightAgentRequest, InsightAgentResponse
@@ -15,8 +17,28 @@ engine = InsightAgentEngine()
 
 
 @app.post("/analyze", response_model=InsightAgentResponse)
-async def analyze(request: InsightAgentRequest) -> InsightAgentResponse:
+async def analyze(
+    request: InsightAgentRequest,
+    approximate: Optional[bool] = Query(
+        None, description="Analyze a stratified sample instead of every row."
+    ),
+    sample_size: Optional[int] = Query(
+        None, gt=0, description="Rows drawn in the first approximate pass."
+    ),
+    latency_budget_ms: Optional[float] = Query(
+        None, gt=0, description="Wall-clock budget for approximate passes."
+    ),
+) -> InsightAgentResponse:
+    overrides = {
+        key: value
+        for key, value in {
+            "approximate": approximate,
+            "sample_size": sample_size,
+            "latency_budget_ms": latency_budget_ms,
+        }.items()
+        if value is not None
+    }
     try:
-        return engine.analyze(request)
+        return engine.analyze(request, runtime_overrides=overrides)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from insight_agent.server.api import app  # noqa: E402
+
+
+SAMPLE = Path(__file__).resolve().parents[1] / "data" / "sample_paid_media.csv"
+
+
+def test_analyze_accepts_approximate_overrides() -> None:
+    client = TestClient(app)
+    payload = {
+        "dataset_name": "preview",
+        "records": pd.read_csv(SAMPLE).to_dict(orient="records"),
+    }
+
+    exact = client.post("/analyze", json=payload)
+    preview = client.post(
+        "/analyze",
+        params={"approximate": "true", "sample_size": 3, "latency_budget_ms": 5000},
+        json=payload,
+    )
+
+    assert exact.status_code == 200
+    assert exact.json()["approximation"] is None
+    assert preview.status_code == 200
+    body = preview.json()
+    assert body["config"]["approximate"] is True
+    assert body["approximation"]["rows_total"] == 6
+    assert client.post("/analyze", params={"sample_size": 0}, json=payload).status_code == 422
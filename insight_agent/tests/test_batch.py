@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from insight_agent import batch
+from insight_agent.batch import (
+    MANIFEST_NAME,
+    BatchRunner,
+    ExportFile,
+    read_results,
+    scan_exports,
+)
+from insight_agent.cli import main
+
+
+SAMPLE = Path(__file__).resolve().parents[1] / "data" / "sample_paid_media.csv"
+analyze_export = batch._analyze_export
+
+
+def crash_on_boom(export: ExportFile) -> Dict[str, Any]:
+    if Path(export.path).name == "boom.csv":
+        os._exit(1)
+    return analyze_export(export)
+
+
+def build_archive(root: Path) -> None:
+    for month in ("2024-01", "2024-02"):
+        folder = root / month / "meta"
+        folder.mkdir(parents=True)
+        for idx in range(2):
+            shutil.copy(SAMPLE, folder / f"export_{idx}.csv")
+    (root / "notes.txt").write_text("not an export")
+    (root / "broken.csv").write_text("")
+
+
+def read_partitions(output: Path) -> list[dict[str, object]]:
+    return [
+        json.loads(line)
+        for part in sorted(output.glob("part-*.ndjson"))
+        for line in part.read_text().splitlines()
+    ]
+
+
+def test_scan_exports_walks_directories_and_globs(tmp_path: Path) -> None:
+    build_archive(tmp_path)
+
+    scanned = scan_exports([str(tmp_path)])
+    globbed = scan_exports([str(tmp_path / "2024-01" / "**" / "*.csv")])
+
+    assert len(scanned) == 5
+    assert [Path(export.path).parent.name for export in globbed] == ["meta", "meta"]
+
+
+def test_cli_writes_partitions_and_resumes(tmp_path: Path) -> None:
+    archive = tmp_path / "archive"
+    output = tmp_path / "out"
+    build_archive(archive)
+
+    exit_code = main(
+        [str(archive), "-o", str(output), "--workers", "2", "--partition-size", "2"]
+    )
+
+    assert exit_code == 1  # broken.csv is reported as failed
+    results = read_partitions(output)
+    assert len(results) == 5
+    assert {record["status"] for record in results} == {"ok", "error"}
+    ok = next(record for record in results if record["status"] == "ok")
+    assert ok["rows"] == 6
+    assert ok["metrics_snapshot"]["spend"] > 0
+    assert len(list(output.glob("part-*.ndjson"))) == 3
+
+    (archive / "2024-02" / "meta" / "export_2.csv").write_bytes(SAMPLE.read_bytes())
+    stats = BatchRunner(output_dir=output).run(scan_exports([str(archive)]))
+
+    assert stats.skipped == 5
+    assert stats.files == 1
+    manifest = (output / MANIFEST_NAME).read_text().splitlines()
+    assert len(manifest) == 6
+    assert json.loads(manifest[-1])["partition"] == 3
+
+
+def test_reanalyzed_exports_supersede_earlier_records(tmp_path: Path) -> None:
+    archive = tmp_path / "archive"
+    output = tmp_path / "out"
+    archive.mkdir()
+    shutil.copy(SAMPLE, archive / "a.csv")
+    shutil.copy(SAMPLE, archive / "b.csv")
+    BatchRunner(output_dir=output).run(scan_exports([str(archive)]))
+
+    stat = (archive / "a.csv").stat()
+    os.utime(archive / "a.csv", (stat.st_atime, stat.st_mtime + 60))
+    stats = BatchRunner(output_dir=output).run(scan_exports([str(archive)]))
+
+    assert stats.files == 1
+    raw = [record["file"] for record in read_partitions(output)]
+    assert raw.count(str((archive / "a.csv").resolve())) == 2
+    current = {
+        Path(record["file"]).name: record["partition"] for record in read_results(output)
+    }
+    assert current == {"a.csv": 1, "b.csv": 0}
+
+
+def test_resume_matches_differently_spelled_paths(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    archive = tmp_path / "archive"
+    build_archive(archive)
+    monkeypatch.chdir(tmp_path)
+    BatchRunner(output_dir="out").run(scan_exports(["./archive/"]))
+
+    monkeypatch.chdir(archive)
+    stats = BatchRunner(output_dir=tmp_path / "out").run(scan_exports([str(archive)]))
+
+    assert stats.files == 0
+    assert stats.skipped == 5
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="workers only see the patched function when forked",
+)
+def test_worker_crash_is_recorded_and_the_run_continues(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    archive = tmp_path / "archive"
+    output = tmp_path / "out"
+    archive.mkdir()
+    for name in ("a.csv", "boom.csv", "c.csv", "d.csv", "e.csv"):
+        shutil.copy(SAMPLE, archive / name)
+    monkeypatch.setattr(batch, "_analyze_export", crash_on_boom)
+
+    stats = BatchRunner(output_dir=output, workers=2).run(scan_exports([str(archive)]))
+
+    assert stats.files == 5
+    assert stats.errors == 1
+    status = {Path(record["file"]).name: record["status"] for record in read_results(output)}
+    assert status == {
+        "a.csv": "ok",
+        "boom.csv": "error",
+        "c.csv": "ok",
+        "d.csv": "ok",
+        "e.csv": "ok",
+    }
+
+
+def test_commit_interval_publishes_partial_partitions(tmp_path: Path) -> None:
+    archive = tmp_path / "archive"
+    output = tmp_path / "out"
+    build_archive(archive)
+
+    BatchRunner(output_dir=output, partition_size=500, commit_interval=0).run(
+        scan_exports([str(archive)])
+    )
+
+    assert len(list(output.glob("part-*.ndjson"))) == 5
+    assert len((output / MANIFEST_NAME).read_text().splitlines()) == 5
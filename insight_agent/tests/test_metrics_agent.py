@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from insight_agent.agents.metrics_agent import MetricsAgent
+from insight_agent.agents.recommendation_agent import RecommendationAgent
+from insight_agent.engine import InsightAgentEngine
+from insight_agent.schemas import ColumnMapping, InsightAgentRequest
+
+
+def build_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "campaign": "Evergreen",
+                "adset": "Retargeting",
+                "ad": "Carousel",
+                "spend": 100,
+                "impressions": 10000,
+                "clicks": 300,
+                "purchases": 4,
+                "value": 400,
+            },
+            {
+                "campaign": "Spring",
+                "adset": "Broad",
+                "ad": "Hook V1",
+                "spend": 40,
+                "impressions": 4000,
+                "clicks": 40,
+                "purchases": 1,
+                "value": 40,
+            },
+            {
+                "campaign": "Spring",
+                "adset": "Broad",
+                "ad": "Hook V2",
+                "spend": 40,
+                "impressions": 4000,
+                "clicks": 40,
+                "purchases": 1,
+                "value": 40,
+            },
+            {
+                "campaign": "Spring",
+                "adset": "Lookalike",
+                "ad": "Hook V1",
+                "spend": 20,
+                "impressions": 2000,
+                "clicks": 20,
+                "purchases": 2,
+                "value": 120,
+            },
+        ]
+    )
+
+
+MAPPING = ColumnMapping(
+    spend="spend",
+    impressions="impressions",
+    clicks="clicks",
+    purchases="purchases",
+    purchase_value="value",
+    campaign_name="campaign",
+    adset_name="adset",
+    ad_name="ad",
+)
+
+
+def test_rollups_build_campaign_adset_ad_tree() -> None:
+    result = MetricsAgent(mapping=MAPPING, rollup_depth="ad").run(build_frame())
+
+    assert [node.name for node in result.rollups] == ["Evergreen", "Spring"]
+    spring = result.rollups[1]
+    assert spring.metrics["spend"] == pytest.approx(100)
+    assert spring.metrics["roas"] == pytest.approx(2.0)
+    assert spring.metrics["cpa"] == pytest.approx(25)
+    assert [child.name for child in spring.children] == ["Broad", "Lookalike"]
+    broad = spring.children[0]
+    assert broad.level == "adset"
+    assert broad.metrics["roas"] == pytest.approx(1.0)
+    assert [ad.name for ad in broad.children] == ["Hook V1", "Hook V2"]
+    assert broad.children[0].metrics["ctr"] == pytest.approx(0.01)
+
+
+def test_rollups_stop_at_adset_by_default() -> None:
+    result = MetricsAgent(mapping=MAPPING).run(build_frame())
+
+    adsets = [adset for campaign in result.rollups for adset in campaign.children]
+    assert [adset.name for adset in adsets] == ["Retargeting", "Broad", "Lookalike"]
+    assert all(not adset.children for adset in adsets)
+
+
+def test_rules_fire_at_adset_level() -> None:
+    result = MetricsAgent(mapping=MAPPING).run(build_frame())
+
+    insights = RecommendationAgent().run(result.entity_metrics, rollups=result.rollups)
+
+    adset_alerts = [
+        insight
+        for insight in insights
+        if insight.supporting_data.get("level") == "adset"
+    ]
+    assert len(adset_alerts) == 1
+    assert adset_alerts[0].summary.startswith("Ad set ROAS below efficiency guardrail")
+    assert adset_alerts[0].impacted_entities == ["Spring & Broad"]
+    assert adset_alerts[0].severity == "critical"
+
+
+def test_engine_rules_fire_at_configured_ad_level() -> None:
+    request = InsightAgentRequest(
+        dataset_name="rollups", records=build_frame().to_dict(orient="records")
+    )
+
+    response = InsightAgentEngine().analyze(
+        request,
+        runtime_overrides={
+            "rollup_depth": "ad",
+            "rollup_rule_levels": ["ad"],
+            "roas_guardrail": 5.0,
+        },
+    )
+
+    levels = {insight.supporting_data.get("level") for insight in response.insights}
+    assert "ad" in levels
+    assert not levels & {"campaign", "adset"}
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from insight_agent.agents.sampling_agent import SamplingAgent
+from insight_agent.engine import MIN_SAMPLE_SIZE, InsightAgentEngine
+from insight_agent.schemas import ColumnMapping, InsightAgentRequest
+
+
+def build_records(rows: int = 5000) -> list[dict[str, object]]:
+    rng = np.random.default_rng(7)
+    spend = rng.lognormal(mean=3.0, sigma=1.2, size=rows)
+    impressions = spend * rng.uniform(80, 120, size=rows)
+    frame = pd.DataFrame(
+        {
+            "Campaign name": rng.choice(["Spring", "Evergreen", "Summer"], size=rows),
+            "Ad name": [f"Ad {idx}" for idx in range(rows)],
+            "Spend": spend.round(2),
+            "Impressions": impressions.round(),
+            "Clicks": (impressions * rng.uniform(0.005, 0.03, size=rows)).round(),
+            "Purchases": rng.poisson(2, size=rows),
+            "Purchase value": (spend * rng.uniform(0.5, 3.0, size=rows)).round(2),
+        }
+    )
+    return frame.to_dict(orient="records")
+
+
+def test_sample_keeps_top_spenders_and_reweights() -> None:
+    frame = pd.DataFrame(build_records())
+    mapping = ColumnMapping(spend="Spend", impressions="Impressions", clicks="Clicks")
+
+    result = SamplingAgent(mapping=mapping, sample_size=500).run(frame)
+
+    assert result.rows_sampled == 500
+    assert result.weights.sum() == pytest.approx(len(frame))
+    top_spenders = set(frame.nlargest(20, "Spend")["Ad name"])
+    assert top_spenders <= set(result.frame["Ad name"])
+
+
+def test_approximate_mode_reports_intervals_and_refines() -> None:
+    request = InsightAgentRequest(dataset_name="preview", records=build_records())
+    engine = InsightAgentEngine()
+    exact = engine.analyze(request)
+
+    passes = list(
+        engine.analyze_progressive(
+            request, runtime_overrides={"approximate": True, "sample_size": 500}
+        )
+    )
+
+    assert exact.approximation is None
+    assert [response.approximation.passes for response in passes] == [1, 2]
+    assert passes[1].approximation.rows_sampled == 2000
+    for response in passes:
+        intervals = response.approximation.confidence_intervals
+        for metric in ("spend", "clicks", "ctr", "roas"):
+            low, high = intervals[metric]
+            assert low <= exact.metrics_snapshot[metric] <= high
+
+
+@pytest.mark.parametrize(("sample_size", "strata"), [(1, 10), (2, 10), (3, 10), (30, 50)])
+def test_weights_cover_every_row_for_small_budgets(sample_size: int, strata: int) -> None:
+    frame = pd.DataFrame(build_records(2000))
+    mapping = ColumnMapping(spend="Spend", impressions="Impressions", clicks="Clicks")
+
+    result = SamplingAgent(mapping=mapping, sample_size=sample_size, strata=strata).run(frame)
+
+    assert result.rows_sampled == sample_size
+    assert result.weights.sum() == pytest.approx(result.rows_total)
+
+
+def test_zero_spend_rows_keep_a_draw_after_certainty_rows() -> None:
+    frame = pd.DataFrame(
+        {"Spend": [1000.0, 900.0] + [0.0] * 50, "Impressions": 10, "Clicks": 1}
+    )
+    mapping = ColumnMapping(spend="Spend", impressions="Impressions", clicks="Clicks")
+
+    result = SamplingAgent(mapping=mapping, sample_size=2).run(frame)
+
+    assert result.weights.sum() == pytest.approx(len(frame))
+    impressions = pd.to_numeric(result.frame["Impressions"]) * result.weights
+    assert impressions.sum() == pytest.approx(520)
+
+
+def test_refinement_reuses_prepared_frame() -> None:
+    request = InsightAgentRequest(dataset_name="preview", records=build_records())
+    engine = InsightAgentEngine()
+    prepare_graph = engine._prepare_graph
+    calls: list[int] = []
+
+    class CountingGraph:
+        def invoke(self, state):  # type: ignore[no-untyped-def]
+            calls.append(1)
+            return prepare_graph.invoke(state)
+
+    engine._prepare_graph = CountingGraph()
+    passes = list(
+        engine.analyze_progressive(
+            request, runtime_overrides={"approximate": True, "sample_size": 500}
+        )
+    )
+
+    assert len(passes) == 2
+    assert len(calls) == 1
+
+
+def test_approximate_response_echoes_only_sampled_rows() -> None:
+    request = InsightAgentRequest(dataset_name="preview", records=build_records())
+
+    response = InsightAgentEngine().analyze(
+        request, runtime_overrides={"approximate": True, "sample_size": 300}
+    )
+
+    assert response.approximation is not None
+    rows = response.resolved_context.normalized_rows
+    assert len(rows) == response.approximation.rows_sampled == 1200
+    assert {row["Ad name"] for row in rows} <= {record["Ad name"] for record in request.records}
+
+
+def test_cold_engine_honours_latency_budget() -> None:
+    request = InsightAgentRequest(dataset_name="preview", records=build_records(20000))
+    engine = InsightAgentEngine()
+
+    passes = list(
+        engine.analyze_progressive(
+            request, runtime_overrides={"approximate": True, "latency_budget_ms": 1500}
+        )
+    )
+
+    assert passes[0].approximation.rows_sampled == MIN_SAMPLE_SIZE
+    for response in passes:
+        assert response.approximation.elapsed_ms <= 1500
+        assert not response.approximation.over_budget
+
+
+def test_spent_budget_warns_and_analyzes_minimum_sample() -> None:
+    request = InsightAgentRequest(dataset_name="preview", records=build_records())
+
+    with pytest.warns(RuntimeWarning, match="spent before sampling"):
+        passes = list(
+            InsightAgentEngine().analyze_progressive(
+                request, runtime_overrides={"approximate": True, "latency_budget_ms": 0.01}
+            )
+        )
+
+    assert len(passes) == 1
+    assert passes[0].approximation.rows_sampled == MIN_SAMPLE_SIZE
+    assert passes[0].approximation.over_budget
+
+
+@pytest.mark.parametrize("sample_size", [10, 20])
+def test_small_samples_give_positive_width_intervals_that_cover(sample_size: int) -> None:
+    request = InsightAgentRequest(dataset_name="preview", records=build_records())
+    engine = InsightAgentEngine()
+    exact = engine.analyze(request).metrics_snapshot
+    covered = {metric: 0 for metric in ("spend", "clicks", "ctr", "roas")}
+
+    seeds = range(40)
+    for seed in seeds:
+        response = next(
+            engine.analyze_progressive(
+                request,
+                runtime_overrides={
+                    "approximate": True,
+                    "sample_size": sample_size,
+                    "sample_seed": seed,
+                },
+            )
+        )
+        for metric in covered:
+            low, high = response.approximation.confidence_intervals[metric]
+            assert high > low
+            covered[metric] += low <= exact[metric] <= high
+
+    assert min(covered.values()) >= 0.7 * len(seeds)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import warnings
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from insight_agent.agents.timeseries_agent import TimeSeriesAgent
+from insight_agent.engine import InsightAgentEngine
+from insight_agent.schemas import ColumnMapping, InsightAgentRequest
+
+
+def build_daily_records() -> list[dict[str, object]]:
+    records: list[dict[str, object]] = []
+    for offset, day in enumerate(pd.date_range("2024-03-01", periods=14, freq="D")):
+        late = offset >= 7
+        records.append(
+            {
+                "Date": day.strftime("%Y-%m-%d"),
+                "Campaign name": "Spring Launch",
+                "Ad set name": "Broad",
+                "Ad name": "Hook V1",
+                "Spend": 100,
+                "Impressions": 10000,
+                "Clicks": 100 if late else 200,
+                "Frequency": 3.0 if late else 2.0,
+                "Purchases": 4,
+                "Purchase value": 400,
+                "Adds to cart": 10,
+            }
+        )
+        records.append(
+            {
+                "Date": day.strftime("%Y-%m-%d"),
+                "Campaign name": "Spring Launch",
+                "Ad set name": "Broad",
+                "Ad name": "Hook V2",
+                "Spend": 50 if late else 25,
+                "Impressions": 5000,
+                "Clicks": 100,
+                "Frequency": 1.5,
+                "Purchases": 2,
+                "Purchase value": 200,
+                "Adds to cart": 5,
+            }
+        )
+    return records
+
+
+def test_rolling_windows_per_entity() -> None:
+    mapping = ColumnMapping(
+        spend="Spend",
+        impressions="Impressions",
+        clicks="Clicks",
+        frequency="Frequency",
+        date="Date",
+        campaign_name="Campaign name",
+        adset_name="Ad set name",
+        ad_name="Ad name",
+    )
+    result = TimeSeriesAgent(mapping=mapping).run(pd.DataFrame(build_daily_records()))
+
+    frame = result.frame.set_index("Ad name")
+    assert len(frame) == 2
+    assert frame.loc["Hook V1", "Spend"] == pytest.approx(1400)
+    assert frame.loc["Hook V1", "ctr_7d"] == pytest.approx(0.01)
+    assert frame.loc["Hook V1", "ctr_prev_7d"] == pytest.approx(0.02)
+    assert frame.loc["Hook V1", "frequency_growth"] == pytest.approx(0.5)
+    assert frame.loc["Hook V2", "spend_pacing"] == pytest.approx(2.0)
+    assert result.mapping.ctr_7d == "ctr_7d"
+    assert len(result.daily) == 28
+
+
+def test_engine_detects_fatigue_from_daily_rows() -> None:
+    request = InsightAgentRequest(dataset_name="daily", records=build_daily_records())
+
+    response = InsightAgentEngine().analyze(request)
+
+    assert response.resolved_context.column_mapping.date == "Date"
+    fatigue = [insight for insight in response.insights if insight.topic == "fatigue"]
+    assert len(fatigue) == 1
+    assert fatigue[0].severity == "warning"
+    assert fatigue[0].impacted_entities == ["Spring Launch, Broad & Hook V1"]
+
+
+def test_single_date_exports_keep_precomputed_windows() -> None:
+    dataset = Path(__file__).resolve().parents[1] / "data" / "sample_paid_media.csv"
+    frame = pd.read_csv(dataset)
+    frame["CTR 7d"] = frame["CTR 7d %"]
+    frame["CTR prev 7d"] = frame["CTR prev7 %"]
+    engine = InsightAgentEngine()
+
+    def fatigue_count(records: list[dict[str, object]]) -> int:
+        response = engine.analyze(InsightAgentRequest(dataset_name="sample", records=records))
+        return sum(insight.topic == "fatigue" for insight in response.insights)
+
+    baseline = fatigue_count(frame.to_dict(orient="records"))
+    frame["Reporting starts"] = "2024-03-01"
+    with_date = fatigue_count(frame.to_dict(orient="records"))
+
+    assert baseline > 0
+    assert with_date == baseline
+
+
+def test_undated_rows_count_towards_entity_totals() -> None:
+    records = build_daily_records()
+    records.append({**records[0], "Date": "", "Spend": 250})
+    mapping = ColumnMapping(
+        spend="Spend",
+        impressions="Impressions",
+        clicks="Clicks",
+        date="Date",
+        campaign_name="Campaign name",
+        adset_name="Ad set name",
+        ad_name="Ad name",
+    )
+
+    result = TimeSeriesAgent(mapping=mapping).run(pd.DataFrame(records))
+
+    frame = result.frame.set_index("Ad name")
+    assert frame.loc["Hook V1", "Spend"] == pytest.approx(1650)
+    assert frame.loc["Hook V1", "ctr_7d"] == pytest.approx(0.01)
+
+
+def test_offset_aware_dates_parse_without_warnings() -> None:
+    records = build_daily_records()
+    for record in records:
+        record["Date"] = f"{record['Date']}T00:00:00+02:00"
+    mapping = ColumnMapping(
+        spend="Spend",
+        impressions="Impressions",
+        clicks="Clicks",
+        date="Date",
+        ad_name="Ad name",
+    )
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = TimeSeriesAgent(mapping=mapping).run(pd.DataFrame(records))
+
+    assert len(result.frame) == 2
+    assert result.frame.set_index("Ad name").loc["Hook V1", "ctr_7d"] == pytest.approx(0.01)
+
+
+def test_generic_pacing_column_does_not_block_spend_pacing() -> None:
+    records = [{**record, "Pacing": "Standard"} for record in build_daily_records()]
+
+    response = InsightAgentEngine().analyze(
+        InsightAgentRequest(dataset_name="daily", records=records)
+    )
+
+    assert response.resolved_context.column_mapping.spend_pacing == "spend_pacing"